@@ -3,11 +3,17 @@
 
 import http.client as httplib
 import httplib2
+import logging
 import os
+import queue
 import random
+import re
+import stat
 import sys
-import time
+import threading
 import glob
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from apiclient.discovery import build
@@ -22,7 +28,32 @@ from oauth2client.tools import argparser, run_flow
 httplib2.RETRIES = 1
 
 # Maximum number of times to retry before giving up.
-MAX_RETRIES = 10
+MAX_RETRIES = 5
+
+# Retry delays grow exponentially from RETRY_BASE_DELAY seconds and are
+# capped at RETRY_MAX_DELAY seconds, so a single retry never stalls for long.
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Upper bound on how long a server's Retry-After header can make us wait.
+RETRY_AFTER_MAX_DELAY = 120.0
+
+# Number of uploads to run at the same time. Beyond a handful of parallel
+# uploads the gains flatten out and write timeouts become more likely.
+DEFAULT_PARALLEL_UPLOADS = 3
+
+# Size of each resumable-upload chunk, in MiB. Large enough to amortize the
+# per-request overhead, small enough to bound memory and retry granularity.
+DEFAULT_CHUNK_SIZE_MB = 8
+
+# Abort the remaining uploads after this many failures in a row.
+DEFAULT_ABORT_AFTER_FAILURES = 3
+
+# Seconds to wait on a stalled connection before treating it as a retriable error.
+SOCKET_TIMEOUT = 300
+
+# Log upload progress only every this many chunks.
+PROGRESS_EVERY_N_CHUNKS = 8
 
 # Always retry when these exceptions are raised.
 RETRIABLE_EXCEPTIONS = (
@@ -33,8 +64,9 @@ RETRIABLE_EXCEPTIONS = (
 )
 
 # Always retry when an apiclient.errors.HttpError with one of these status
-# codes is raised.
-RETRIABLE_STATUS_CODES = [500, 502, 503, 504]
+# codes is raised, waiting for as long as a Retry-After header asks if present
+# (up to RETRY_AFTER_MAX_DELAY seconds).
+RETRIABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
 CLIENT_SECRETS_FILE = "client_secrets.json"
 
@@ -59,8 +91,26 @@ https://developers.google.com/api-client-library/python/guide/aaa_client_secrets
 
 VALID_PRIVACY_STATUSES = ("unlisted", "private", "public")
 
+# Common video extensions, matched case-insensitively.
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v'})
+
+# Parts of the video resource set by the request body built in _make_body.
+VIDEO_PARTS = "snippet,status"
+
+# Comma-separated list of file numbers, e.g. "1, 3,4"
+FILE_NUMBERS_RE = re.compile(r'^\s*\d+\s*(?:,\s*\d+\s*)*$')
 
-def get_authenticated_service(args):
+logger = logging.getLogger(__name__)
+
+# Per-thread YouTube service, so each upload worker keeps one authorized
+# httplib2.Http (and its open keep-alive connections) for all its uploads.
+_thread_local = threading.local()
+
+# Set to make running uploads stop after their current chunk.
+_stop_uploads = threading.Event()
+
+
+def get_credentials(args):
     flow = flow_from_clientsecrets(
         CLIENT_SECRETS_FILE,
         scope=YOUTUBE_UPLOAD_SCOPE,
@@ -73,16 +123,22 @@ def get_authenticated_service(args):
     if credentials is None or credentials.invalid:
         credentials = run_flow(flow, storage, args)
 
+    return credentials
+
+
+def build_service(credentials):
     return build(
         YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION,
-        http=credentials.authorize(httplib2.Http())
+        http=credentials.authorize(httplib2.Http(timeout=SOCKET_TIMEOUT))
     )
 
 
-def initialize_upload(youtube, file_path, title, description, keywords, category, privacy_status):
-    tags = keywords.split(",") if keywords else None
+def split_keywords(keywords):
+    return keywords.split(",") if keywords else None
+
 
-    body = dict(
+def _make_body(title, description, tags, category, privacy_status):
+    return dict(
         snippet=dict(
             title=title,
             description=description,
@@ -94,64 +150,179 @@ def initialize_upload(youtube, file_path, title, description, keywords, category
         )
     )
 
-    insert_request = youtube.videos().insert(
-        part=",".join(body.keys()),
-        body=body,
-        media_body=MediaFileUpload(file_path, chunksize=-1, resumable=True)
-    )
 
-    return resumable_upload(insert_request, file_path)
+def initialize_upload(youtube, file_path, title, description, tags, category, privacy_status,
+                      chunk_size_mb=DEFAULT_CHUNK_SIZE_MB, max_retries=MAX_RETRIES):
+    # Chunks are read straight from the open file, so only one chunk is held in memory
+    media = MediaFileUpload(file_path, chunksize=chunk_size_mb * 1024 * 1024, resumable=True)
+
+    try:
+        insert_request = youtube.videos().insert(
+            part=VIDEO_PARTS,
+            body=_make_body(title, description, tags, category, privacy_status),
+            media_body=media
+        )
+        return resumable_upload(insert_request, file_path, max_retries)
+    finally:
+        # Release the file handle now, not whenever the upload object is collected
+        media.stream().close()
+
+
+def get_thread_service(credentials):
+    """Return the service for the current thread, building it on first use"""
+    youtube = getattr(_thread_local, "youtube", None)
+    if youtube is None:
+        youtube = _thread_local.youtube = build_service(credentials)
+    return youtube
+
+
+def upload_video(credentials, file_path, title, description, tags, category, privacy_status,
+                 chunk_size_mb=DEFAULT_CHUNK_SIZE_MB, max_retries=MAX_RETRIES):
+    """Upload one video on the worker's own service object (httplib2.Http is not thread-safe)"""
+    youtube = get_thread_service(credentials)
+    return initialize_upload(youtube, file_path, title, description, tags, category, privacy_status,
+                             chunk_size_mb, max_retries)
+
+
+def get_retry_delay(retry):
+    """Capped exponential backoff with half jitter"""
+    max_sleep = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** retry))
+    return max_sleep * (0.5 + random.random() * 0.5)
+
+
+def get_retry_after(resp):
+    """Seconds asked for by a Retry-After header, or None if absent or not a number"""
+    try:
+        return max(0.0, float(resp.get('retry-after')))
+    except (TypeError, ValueError):
+        return None
 
 
-def resumable_upload(insert_request, file_path):
+def resumable_upload(insert_request, file_path, max_retries=MAX_RETRIES):
     response = None
     error = None
+    retry_after = None
     retry = 0
+    chunk_idx = 0
     filename = os.path.basename(file_path)
+    logger.info("[%s] Uploading...", filename)
     while response is None:
+        if _stop_uploads.is_set():
+            logger.warning("[%s] Upload cancelled.", filename)
+            return None
+
         try:
-            print(f"Uploading {filename}...")
             status, response = insert_request.next_chunk()
+            # The chunk went through, so the next error starts a fresh retry budget and backoff
+            retry = 0
+            chunk_idx += 1
+            if status is not None and chunk_idx % PROGRESS_EVERY_N_CHUNKS == 0:
+                logger.info("[%s] Uploaded %d%%", filename, int(status.progress() * 100))
             if response is not None:
                 if 'id' in response:
-                    print(f"Video '{filename}' (id: {response['id']}) was successfully uploaded.")
+                    logger.info("[%s] Video (id: %s) was successfully uploaded.", filename, response['id'])
                     return response['id']
                 else:
-                    print(f"The upload of '{filename}' failed with an unexpected response: {response}")
+                    logger.error("[%s] The upload failed with an unexpected response: %s", filename, response)
                     return None
         except HttpError as e:
             if e.resp.status in RETRIABLE_STATUS_CODES:
-                error = f"A retriable HTTP error {e.resp.status} occurred for '{filename}':\n{e.content}"
+                error = f"A retriable HTTP error {e.resp.status} occurred:\n{e.content}"
+                retry_after = get_retry_after(e.resp)
             else:
                 raise
         except RETRIABLE_EXCEPTIONS as e:
-            error = f"A retriable error occurred for '{filename}': {e}"
+            error = f"A retriable error occurred: {e}"
 
         if error is not None:
-            print(error)
+            logger.warning("[%s] %s", filename, error)
             retry += 1
-            if retry > MAX_RETRIES:
-                print(f"No longer attempting to retry '{filename}'.")
+            if retry > max_retries:
+                logger.error("[%s] No longer attempting to retry.", filename)
                 return None
 
-            max_sleep = 2 ** retry
-            sleep_seconds = random.random() * max_sleep
-            print(f"Sleeping {sleep_seconds:.2f} seconds and then retrying...")
-            time.sleep(sleep_seconds)
+            if retry_after is None:
+                sleep_seconds = get_retry_delay(retry)
+            elif retry_after > RETRY_AFTER_MAX_DELAY:
+                logger.warning("[%s] Server asked to wait %.0f seconds, capping at %.0f.",
+                               filename, retry_after, RETRY_AFTER_MAX_DELAY)
+                sleep_seconds = RETRY_AFTER_MAX_DELAY
+            else:
+                sleep_seconds = retry_after
+            logger.warning("[%s] Sleeping %.2f seconds and then retrying...", filename, sleep_seconds)
+            _stop_uploads.wait(sleep_seconds)
             error = None
+            retry_after = None
     return None
 
 
+class CircuitBreaker:
+    """Cancels the queued uploads as soon as too many uploads in a row have failed"""
+
+    def __init__(self, max_failures):
+        self.max_failures = max_failures
+        self.tripped = threading.Event()
+        self._consecutive_failures = 0
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def watch(self, future):
+        with self._lock:
+            self._futures.append(future)
+            if self.tripped.is_set():
+                future.cancel()
+        future.add_done_callback(self._record)
+
+    def _record(self, future):
+        # Runs in the worker thread as each upload finishes
+        if future.cancelled():
+            return
+        succeeded = future.exception() is None and bool(future.result())
+
+        with self._lock:
+            if self.tripped.is_set():
+                return
+            self._consecutive_failures = 0 if succeeded else self._consecutive_failures + 1
+            if not self.max_failures or self._consecutive_failures < self.max_failures:
+                return
+            self.tripped.set()
+            pending = list(self._futures)
+
+        for other in pending:
+            other.cancel()
+
+
+def setup_logging():
+    """Queue log records for a background writer thread so uploads never block on stdout
+
+    Records are held in the queue until the returned listener is started.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    return QueueListener(log_queue, handler)
+
+
 def select_folder():
     """Interactive folder selection"""
     current_path = Path.cwd()
+    dir_cache = {}  # Directory listings already seen, keyed by path
 
     while True:
         print(f"\nCurrent directory: {current_path}")
 
         # List directories
-        dirs = [d for d in current_path.iterdir() if d.is_dir()]
-        dirs.sort()
+        dirs = dir_cache.get(current_path)
+        if dirs is None:
+            # Symlinked folders are followed on purpose, as Path.is_dir() did before
+            with os.scandir(current_path) as entries:
+                dirs = sorted(Path(e.path) for e in entries if e.is_dir())
+            dir_cache[current_path] = dirs
 
         print("\nDirectories:")
         for i, d in enumerate(dirs, 1):
@@ -180,27 +351,31 @@ def select_folder():
             print("Invalid choice.")
 
 
-def select_video_files(folder_path):
+def select_video_files(folder_path, show_size=True):
     """Interactive video file selection with support for comma-separated numbers"""
-    # Common video extensions
-    video_extensions = ['*.mp4', '*.avi', '*.mov', '*.mkv', '*.wmv', '*.flv', '*.webm', '*.m4v']
-
+    # A single directory pass, keeping (path, size) pairs. Sizes come from the
+    # DirEntry and are skipped entirely when not shown, as stat can be slow on
+    # network mounts.
     video_files = []
-    for ext in video_extensions:
-        video_files.extend(folder_path.glob(ext))
-        video_files.extend(folder_path.glob(ext.upper()))
-
-    video_files = list(set(video_files))  # Remove duplicates
-    video_files.sort()
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS:
+                file_size = entry.stat().st_size if show_size else None
+                video_files.append((Path(entry.path), file_size))
+    video_files.sort(key=lambda f: f[0])
 
     if not video_files:
         print(f"No video files found in {folder_path}")
         return []
 
     print(f"\nVideo files in {folder_path}:")
-    for i, f in enumerate(video_files, 1):
-        file_size = f.stat().st_size / (1024*1024)  # Size in MB
-        print(f"  {i}. {f.name} ({file_size:.1f} MB)")
+    for i, (f, file_size) in enumerate(video_files, 1):
+        if file_size is None:
+            print(f"  {i}. {f.name}")
+        else:
+            print(f"  {i}. {f.name} ({file_size / (1024*1024):.1f} MB)")
+
+    video_files = [f for f, _ in video_files]
 
     while True:
         choice = input(f"\nEnter file numbers (comma-separated, e.g., 1,3,4,5) or 'all' for all files: ").strip()
@@ -211,24 +386,39 @@ def select_video_files(folder_path):
         if choice.lower() == 'q':
             return []
 
+        if not FILE_NUMBERS_RE.match(choice):
+            print("Invalid input. Please enter numbers separated by commas (e.g., 1,3,4,5)")
+            continue
+
+        # Parse comma-separated numbers, dropping repeats but keeping the given order
+        selected_indices = list(dict.fromkeys(int(x) - 1 for x in choice.split(',')))
+
+        # Validate indices, reporting every bad number at once
+        invalid_numbers = [idx + 1 for idx in selected_indices if not 0 <= idx < len(video_files)]
+        if invalid_numbers:
+            print(f"Invalid file number(s): {', '.join(map(str, invalid_numbers))}")
+            continue
+
+        return [video_files[idx] for idx in selected_indices]
+
+
+def find_unreadable_files(video_files):
+    """Return (file, reason) pairs for files that cannot be uploaded"""
+    problems = []
+    for video_file in video_files:
         try:
-            # Parse comma-separated numbers
-            selected_indices = [int(x.strip()) - 1 for x in choice.split(',')]
-
-            # Validate indices
-            selected_files = []
-            for idx in selected_indices:
-                if 0 <= idx < len(video_files):
-                    selected_files.append(video_files[idx])
-                else:
-                    print(f"Invalid file number: {idx + 1}")
-                    break
-            else:
-                # All indices were valid
-                return selected_files
+            file_stat = video_file.stat()
+        except OSError as e:
+            problems.append((video_file, e.strerror))
+            continue
 
-        except ValueError:
-            print("Invalid input. Please enter numbers separated by commas (e.g., 1,3,4,5)")
+        if not stat.S_ISREG(file_stat.st_mode):
+            problems.append((video_file, "not a regular file"))
+        elif file_stat.st_size == 0:
+            problems.append((video_file, "file is empty"))
+        elif not os.access(video_file, os.R_OK):
+            problems.append((video_file, "file is not readable"))
+    return problems
 
 
 def get_video_metadata(file_path, default_title, default_description, default_keywords, default_category, default_privacy):
@@ -264,9 +454,28 @@ if __name__ == '__main__':
         default=VALID_PRIVACY_STATUSES[0], help="Video privacy status.")
     argparser.add_argument("--same-metadata", action="store_true",
         help="Use same metadata for all videos (interactive mode)")
+    argparser.add_argument("--no-size", action="store_true",
+        help="Don't show file sizes when listing videos, avoiding slow stat calls on network mounts (interactive mode)")
+    argparser.add_argument("--parallel-uploads", type=int, default=DEFAULT_PARALLEL_UPLOADS,
+        help="Number of videos to upload at the same time")
+    argparser.add_argument("--chunk-size-mb", type=int, default=DEFAULT_CHUNK_SIZE_MB,
+        help="Size of each upload chunk in MiB (larger for high-latency links, smaller for low memory)")
+    argparser.add_argument("--max-retries", type=int, default=MAX_RETRIES,
+        help="Number of times in a row to retry a failing upload chunk before giving up on the video")
+    argparser.add_argument("--abort-after-failures", type=int, default=DEFAULT_ABORT_AFTER_FAILURES,
+        help="Skip the remaining videos after this many failed uploads in a row (0 to never abort)")
 
     args = argparser.parse_args()
 
+    if args.parallel_uploads < 1:
+        argparser.error("--parallel-uploads must be at least 1")
+    if args.chunk_size_mb < 1:
+        argparser.error("--chunk-size-mb must be at least 1")
+    if args.max_retries < 0:
+        argparser.error("--max-retries must not be negative")
+    if args.abort_after_failures < 0:
+        argparser.error("--abort-after-failures must not be negative")
+
     video_files = []
 
     if args.interactive:
@@ -278,7 +487,7 @@ if __name__ == '__main__':
         print(f"\nSelected folder: {folder}")
 
         # Select video files
-        video_files = select_video_files(folder)
+        video_files = select_video_files(folder, show_size=not args.no_size)
 
         if not video_files:
             exit("No video files selected.")
@@ -308,47 +517,110 @@ if __name__ == '__main__':
     if not video_files:
         exit("No valid video files to upload.")
 
-    # Get YouTube service
-    youtube = get_authenticated_service(args)
+    # Check the files before paying for the OAuth flow and network round-trips
+    unreadable_files = find_unreadable_files(video_files)
+    if unreadable_files:
+        print(f"\nCannot upload {len(unreadable_files)} file(s):")
+        for video_file, reason in unreadable_files:
+            print(f"  ✗ {video_file}: {reason}")
+        exit("Fix or deselect these files and try again.")
 
-    # Upload videos
-    successful_uploads = []
-    failed_uploads = []
+    # Get YouTube credentials
+    credentials = get_credentials(args)
 
-    print(f"\n=== Starting upload of {len(video_files)} video(s) ===")
+    # While asking for per-video metadata, hold upload logs back so they don't
+    # land in the middle of the prompts; they are written once prompting is done.
+    prompt_per_video = args.interactive and not args.same_metadata
+    log_listener = setup_logging()
+    logs_started = not prompt_per_video
+    if logs_started:
+        log_listener.start()
 
-    for i, video_file in enumerate(video_files, 1):
-        print(f"\n[{i}/{len(video_files)}] Processing: {video_file.name}")
+    # Shared by every video that doesn't get its own metadata
+    default_tags = split_keywords(args.keywords)
 
-        try:
-            if args.interactive and not args.same_metadata:
+    # Upload videos; the video ID (or None on failure) of each finished upload,
+    # keyed by its index in video_files. Videos without an entry were skipped.
+    upload_results = {}
+
+    print(f"\n=== Starting upload of {len(video_files)} video(s) ===")
+
+    executor = ThreadPoolExecutor(max_workers=args.parallel_uploads)
+    try:
+        # Each upload starts as soon as its metadata is known, so prompting for
+        # the next video overlaps with the uploads already running
+        futures = {}
+        breaker = CircuitBreaker(args.abort_after_failures)
+        for i, video_file in enumerate(video_files, 1):
+            # Stop prompting and submitting once the upload endpoint looks persistently broken
+            if breaker.tripped.is_set():
+                print(f"\n{args.abort_after_failures} uploads failed in a row, skipping the remaining videos.")
+                break
+
+            print(f"\n[{i}/{len(video_files)}] Processing: {video_file.name}")
+
+            if prompt_per_video:
                 # Get individual metadata for each video
                 title, description, keywords, category, privacy = get_video_metadata(
                     video_file, args.title, args.description, args.keywords,
                     args.category, args.privacyStatus
                 )
+                tags = split_keywords(keywords)
             else:
                 # Use default/same metadata for all videos
                 title = args.title if len(video_files) == 1 else f"{args.title} - {video_file.stem}"
                 description = args.description
-                keywords = args.keywords
+                tags = default_tags
                 category = args.category
                 privacy = args.privacyStatus
 
-            # Upload video
-            video_id = initialize_upload(youtube, str(video_file), title, description,
-                                       keywords, category, privacy)
-
-            if video_id:
-                successful_uploads.append((video_file.name, video_id))
-            else:
-                failed_uploads.append(video_file.name)
-
-        except HttpError as e:
-            print(f"An HTTP error {e.resp.status} occurred for '{video_file.name}':\n{e.content}")
-            failed_uploads.append(video_file.name)
-        except Exception as e:
-            print(f"An error occurred for '{video_file.name}': {e}")
+            future = executor.submit(upload_video, credentials, str(video_file), title, description,
+                                     tags, category, privacy, args.chunk_size_mb, args.max_retries)
+            futures[future] = i - 1
+            breaker.watch(future)
+
+        if not logs_started:
+            log_listener.start()
+            logs_started = True
+
+        for future in as_completed(futures):
+            idx = futures[future]
+            if future.cancelled():
+                continue
+
+            try:
+                upload_results[idx] = future.result()
+
+            except HttpError as e:
+                print(f"An HTTP error {e.resp.status} occurred for '{video_files[idx].name}':\n{e.content}")
+                upload_results[idx] = None
+            except Exception as e:
+                print(f"An error occurred for '{video_files[idx].name}': {e}")
+                upload_results[idx] = None
+
+    except KeyboardInterrupt:
+        # Drop queued uploads and stop the running ones after their current chunk
+        executor.shutdown(wait=False, cancel_futures=True)
+        _stop_uploads.set()
+        if not logs_started:
+            log_listener.start()
+        log_listener.stop()
+        exit("\nUpload cancelled by user.")
+    executor.shutdown()
+
+    # Flush pending upload logs before printing the summary
+    log_listener.stop()
+
+    # Sort the results back into the order the videos were given
+    successful_uploads = []
+    failed_uploads = []
+    skipped_uploads = []
+    for idx, video_file in enumerate(video_files):
+        if idx not in upload_results:
+            skipped_uploads.append(video_file.name)
+        elif upload_results[idx]:
+            successful_uploads.append((video_file.name, upload_results[idx]))
+        else:
             failed_uploads.append(video_file.name)
 
     # Final summary
@@ -362,4 +634,14 @@ if __name__ == '__main__':
         for filename in failed_uploads:
             print(f"  ✗ {filename}")
 
-    print(f"\nTotal: {len(successful_uploads)} successful, {len(failed_uploads)} failed")
+    if skipped_uploads:
+        if breaker.tripped.is_set():
+            print(f"\nSkipped uploads: {len(skipped_uploads)} "
+                  f"(stopped after {args.abort_after_failures} failed uploads in a row)")
+        else:
+            print(f"\nSkipped uploads: {len(skipped_uploads)}")
+        for filename in skipped_uploads:
+            print(f"  - {filename}")
+
+    print(f"\nTotal: {len(successful_uploads)} successful, {len(failed_uploads)} failed, "
+          f"{len(skipped_uploads)} skipped")